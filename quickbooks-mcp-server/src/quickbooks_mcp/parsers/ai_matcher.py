@@ -2,13 +2,54 @@
 AI-powered account matcher using fuzzy matching and historical patterns.
 Intelligently matches transaction descriptions to chart of accounts.
 """
+import heapq
 import logging
-from typing import Dict, List, Any, Optional
-from fuzzywuzzy import fuzz, process
+import operator
+from collections import Counter, OrderedDict
+from itertools import chain
+from typing import Dict, List, Any, Optional, Tuple
+from rapidfuzz import fuzz, process, utils as rf_utils
+import ahocorasick
+import numpy as np
 import re
+import string
+import time
 
 logger = logging.getLogger(__name__)
 
+# Precompiled description-cleaning helpers (hot path for bulk imports)
+_PREFIX_RE = re.compile(r'^(?:purchase at|payment to|debit card purchase|pos purchase)\s*')
+_NUMS_RE = re.compile(r'#\d+|\d{10,}')
+_PUNCT_TABLE = str.maketrans({c: ' ' for c in string.punctuation if c != '_'})
+
+# Common words ignored during keyword matching
+_STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for'})
+
+# Numba is optional; without it keyword scoring stays on the pure-Python path
+try:
+    import numba
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+# Account-list size at which the JIT scoring path pays for itself
+_NUMBA_MIN_ACCOUNTS = 1000
+
+if _NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, cache=True)
+    def _score_keywords_jit(query_ids, offsets, token_ids, n_accounts):
+        """Count query-token hits per account over CSR-encoded account tokens."""
+        scores = np.zeros(n_accounts, dtype=np.int32)
+        for i in numba.prange(n_accounts):
+            hits = 0
+            for q in query_ids:
+                for j in range(offsets[i], offsets[i + 1]):
+                    if token_ids[j] == q:
+                        hits += 1
+                        break
+            scores[i] = hits
+        return scores
+
 
 class AIAccountMatcher:
     """AI-powered account matching for transactions."""
@@ -23,7 +64,17 @@ class AIAccountMatcher:
         self.account_manager = account_manager
         self.match_history = {}  # Cache for learning patterns
         self.common_patterns = self._load_common_patterns()
-        
+        self._pattern_automaton = self._build_pattern_automaton()
+        self._keyword_index_key = None
+        self._keyword_index = None
+        # Exact-match LRU of (clean_desc, company_id) -> match result;
+        # vendor strings repeat heavily across accounting imports
+        self._result_cache: 'OrderedDict[tuple, Dict[str, Any]]' = OrderedDict()
+        self._result_cache_max = 10000
+        # TTL cache of expense accounts (plus derived lookup structures) per company
+        self._accounts_cache: Dict[str, Dict[str, Any]] = {}
+        self._accounts_ttl = 300.0  # seconds
+
     def _load_common_patterns(self) -> Dict[str, List[str]]:
         """Load common transaction patterns for different account types."""
         return {
@@ -82,6 +133,69 @@ class AIAccountMatcher:
             ]
         }
     
+    def _cache_result(self, cache_key: tuple, result: Dict[str, Any]):
+        """Store a match result in the bounded LRU."""
+        self._result_cache[cache_key] = result
+        if len(self._result_cache) > self._result_cache_max:
+            self._result_cache.popitem(last=False)
+
+    async def _get_expense_accounts(self, company_id: str) -> Dict[str, Any]:
+        """
+        Get expense accounts for a company with a short TTL cache.
+
+        Returns a cache entry holding the account list plus the derived
+        name list and name -> account dict the match helpers need, so
+        they are computed once per refresh instead of once per call.
+        """
+        entry = self._accounts_cache.get(company_id)
+        now = time.monotonic()
+        if entry and now - entry['fetched_at'] < self._accounts_ttl:
+            return entry
+
+        accounts = await self.account_manager.get_chart_of_accounts(company_id, 'expense')
+        # Pre-group accounts by pattern category so _match_by_pattern does a
+        # dict lookup instead of scanning every account name per hit
+        pattern_accounts: Dict[str, List[Dict]] = {}
+        for category in self.common_patterns:
+            category_lower = category.lower()
+            matching = [acc for acc in accounts if category_lower in acc.name.lower()]
+            if matching:
+                pattern_accounts[category] = matching
+        names = [acc.name for acc in accounts]
+        # Distinctive account-name tokens for the exact-token fuzzy fast path
+        token_to_accounts: Dict[str, List[Dict]] = {}
+        for acc in accounts:
+            for token in set(acc.name.lower().split()):
+                if len(token) >= 4 and token not in _STOP_WORDS:
+                    token_to_accounts.setdefault(token, []).append(acc)
+        entry = {
+            'fetched_at': now,
+            'accounts': accounts,
+            'names': names,
+            # Normalized once per refresh so the scorer never re-processes choices
+            'names_processed': [rf_utils.default_process(n) for n in names],
+            'by_name': {acc.name: acc for acc in accounts},
+            'pattern_accounts': pattern_accounts,
+            'token_to_accounts': token_to_accounts,
+        }
+        self._accounts_cache[company_id] = entry
+        return entry
+
+    def _build_pattern_automaton(self) -> ahocorasick.Automaton:
+        """Compile all pattern keywords into a single Aho-Corasick automaton."""
+        # Flatten the dict-of-lists once; the flat pairs feed the automaton
+        # and stay available for anything else that needs keyword->account
+        self._keyword_pairs: List[Tuple[str, str]] = [
+            (keyword.lower(), account_name)
+            for account_name, keywords in self.common_patterns.items()
+            for keyword in keywords
+        ]
+        automaton = ahocorasick.Automaton()
+        for keyword, account_name in self._keyword_pairs:
+            automaton.add_word(keyword, (account_name, keyword))
+        automaton.make_automaton()
+        return automaton
+
     async def match_account(
         self,
         description: str,
@@ -100,11 +214,31 @@ class AIAccountMatcher:
             Match result with account name, confidence score, and alternatives
         """
         logger.info(f"Matching account for: {description}")
-        
+
+        # Clean (and lowercase) once; the matchers share this string and split
+        clean_desc = self._clean_description(description)
+        desc_words = clean_desc.split()
+        cache_key = (clean_desc, company_id)
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            self._result_cache.move_to_end(cache_key)
+            return cached
+
         try:
-            # Get chart of accounts
-            accounts = await self.account_manager.get_chart_of_accounts(company_id, 'expense')
-            
+            # Fast path: pattern-match against any cached chart (even a stale
+            # one; categories are stable) before awaiting a refresh
+            cached_entry = self._accounts_cache.get(company_id)
+            pattern_match = None
+            if cached_entry is not None:
+                pattern_match = self._match_by_pattern(clean_desc, cached_entry)
+                if pattern_match and pattern_match['confidence'] >= 0.9:
+                    self._cache_result(cache_key, pattern_match)
+                    return pattern_match
+
+            # Get chart of accounts (TTL-cached per company)
+            entry = await self._get_expense_accounts(company_id)
+            accounts = entry['accounts']
+
             if not accounts:
                 return {
                     'account_name': 'Uncategorized Expense',
@@ -112,38 +246,43 @@ class AIAccountMatcher:
                     'alternatives': [],
                     'method': 'default'
                 }
-            
-            # Clean description
-            clean_desc = self._clean_description(description)
-            
-            # Try pattern matching first (highest confidence)
-            pattern_match = self._match_by_pattern(clean_desc, accounts)
+
+            # Try pattern matching first (highest confidence), unless the fast
+            # path already ran it against this same cache entry
+            result = None
+            if entry is not cached_entry:
+                pattern_match = self._match_by_pattern(clean_desc, entry)
             if pattern_match and pattern_match['confidence'] >= 0.9:
-                return pattern_match
-            
-            # Try fuzzy matching on account names
-            fuzzy_match = self._fuzzy_match_accounts(clean_desc, accounts)
-            if fuzzy_match and fuzzy_match['confidence'] >= 0.8:
-                return fuzzy_match
-            
-            # Try keyword matching
-            keyword_match = self._match_by_keywords(clean_desc, accounts)
-            if keyword_match and keyword_match['confidence'] >= 0.7:
-                return keyword_match
-            
-            # Return best match or default
-            best_match = pattern_match or fuzzy_match or keyword_match
-            if best_match:
-                return best_match
-            
-            return {
-                'account_name': 'Uncategorized Expense',
-                'confidence': 0.0,
-                'alternatives': [acc['name'] for acc in accounts[:5]],
-                'method': 'default',
-                'suggestion': 'Please manually select the correct account'
-            }
-            
+                result = pattern_match
+
+            if result is None:
+                # Try fuzzy matching on account names
+                fuzzy_match = self._fuzzy_match_accounts(clean_desc, entry)
+                if fuzzy_match and fuzzy_match['confidence'] >= 0.8:
+                    result = fuzzy_match
+                else:
+                    # Try keyword matching
+                    keyword_match = self._match_by_keywords(desc_words, accounts)
+                    if keyword_match and keyword_match['confidence'] >= 0.7:
+                        result = keyword_match
+                    else:
+                        # Return best match or default
+                        result = pattern_match or fuzzy_match or keyword_match
+
+            if result is None:
+                result = {
+                    'account_name': 'Uncategorized Expense',
+                    'confidence': 0.0,
+                    'alternatives': [acc.name for acc in accounts[:5]],
+                    'method': 'default',
+                    'suggestion': 'Please manually select the correct account'
+                }
+
+            # Memoize; repeated vendor strings skip the matching cascade
+            self._cache_result(cache_key, result)
+
+            return result
+
         except Exception as e:
             logger.error(f"Error matching account: {str(e)}")
             return {
@@ -152,109 +291,272 @@ class AIAccountMatcher:
                 'error': str(e)
             }
     
+    async def match_accounts_batch(
+        self,
+        descriptions: List[str],
+        company_id: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Match many transaction descriptions to the chart of accounts in one pass.
+
+        Computes the full description x account score matrix with
+        rapidfuzz.process.cdist (C++ loop, all cores) instead of calling
+        match_account once per transaction.
+
+        Args:
+            descriptions: Transaction descriptions or vendor names
+            company_id: QuickBooks company ID
+
+        Returns:
+            List of match results, one per description, in input order
+        """
+        logger.info(f"Batch matching {len(descriptions)} descriptions")
+
+        try:
+            # Get chart of accounts once for the whole batch (TTL-cached)
+            entry = await self._get_expense_accounts(company_id)
+            accounts = entry['accounts']
+
+            if not accounts:
+                return [{
+                    'account_name': 'Uncategorized Expense',
+                    'confidence': 0.0,
+                    'alternatives': [],
+                    'method': 'default'
+                } for _ in descriptions]
+
+            account_names = entry['names']
+            clean_descs = [self._clean_description(d) for d in descriptions]
+
+            # (M, N) uint8 score matrix computed in parallel C++ workers;
+            # choices are pre-normalized, queries normalized here once
+            scores = process.cdist(
+                [rf_utils.default_process(d) for d in clean_descs],
+                entry['names_processed'],
+                scorer=fuzz.token_set_ratio,
+                workers=-1,
+                score_cutoff=70,
+                dtype=np.uint8
+            )
+
+            results = []
+            for i, clean_desc in enumerate(clean_descs):
+                # Pattern matching still wins when it fires
+                pattern_match = self._match_by_pattern(clean_desc, entry)
+                if pattern_match and pattern_match['confidence'] >= 0.9:
+                    results.append(pattern_match)
+                    continue
+
+                row = scores[i]
+                best_idx = int(np.argmax(row))
+                if row[best_idx] >= 70:
+                    # Top-k alternatives without a full sort
+                    top_k = min(4, len(row))
+                    alt_idx = np.argpartition(row, -top_k)[-top_k:]
+                    alt_idx = alt_idx[np.argsort(row[alt_idx])[::-1]]
+                    results.append({
+                        'account_name': accounts[best_idx].name,
+                        'account_id': accounts[best_idx].id,
+                        'confidence': float(row[best_idx]) / 100.0,
+                        'method': 'fuzzy',
+                        'alternatives': [
+                            account_names[j] for j in alt_idx
+                            if j != best_idx and row[j] >= 70
+                        ][:3]
+                    })
+                    continue
+
+                keyword_match = self._match_by_keywords(clean_desc.split(), accounts)
+                if keyword_match:
+                    results.append(keyword_match)
+                    continue
+
+                results.append({
+                    'account_name': 'Uncategorized Expense',
+                    'confidence': 0.0,
+                    'alternatives': [acc.name for acc in accounts[:5]],
+                    'method': 'default',
+                    'suggestion': 'Please manually select the correct account'
+                })
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Error batch matching accounts: {str(e)}")
+            return [{
+                'account_name': 'Uncategorized Expense',
+                'confidence': 0.0,
+                'error': str(e)
+            } for _ in descriptions]
+
     def _clean_description(self, description: str) -> str:
         """Clean and normalize transaction description."""
         # Convert to lowercase
         clean = description.lower().strip()
-        
+
         # Remove common prefixes
-        prefixes = ['purchase at', 'payment to', 'debit card purchase', 'pos purchase']
-        for prefix in prefixes:
-            if clean.startswith(prefix):
-                clean = clean[len(prefix):].strip()
-        
-        # Remove transaction IDs and numbers
-        clean = re.sub(r'#\d+', '', clean)
-        clean = re.sub(r'\d{10,}', '', clean)  # Remove long numbers
-        
-        # Remove special characters but keep spaces
-        clean = re.sub(r'[^\w\s]', ' ', clean)
-        
+        clean = _PREFIX_RE.sub('', clean, count=1)
+
+        # Remove transaction IDs and long numbers
+        clean = _NUMS_RE.sub('', clean)
+
+        # Remove special characters but keep spaces (C-level translate)
+        clean = clean.translate(_PUNCT_TABLE)
+
         # Remove extra whitespace
         clean = ' '.join(clean.split())
-        
+
         return clean
     
-    def _match_by_pattern(self, description: str, accounts: List[Dict]) -> Optional[Dict[str, Any]]:
-        """Match using predefined patterns."""
-        desc_lower = description.lower()
-        
-        for account_name, keywords in self.common_patterns.items():
-            for keyword in keywords:
-                if keyword.lower() in desc_lower:
-                    # Find this account in the chart of accounts
-                    matching_accounts = [
-                        acc for acc in accounts
-                        if account_name.lower() in acc['name'].lower()
-                    ]
-                    
-                    if matching_accounts:
-                        return {
-                            'account_name': matching_accounts[0]['name'],
-                            'account_id': matching_accounts[0].get('id'),
-                            'confidence': 0.95,
-                            'method': 'pattern',
-                            'matched_keyword': keyword,
-                            'alternatives': [acc['name'] for acc in matching_accounts[1:3]]
-                        }
-        
+    def _match_by_pattern(self, clean_desc: str, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Match using predefined patterns. Expects an already-lowercased description."""
+        pattern_accounts = entry['pattern_accounts']
+
+        # Single linear pass over the description finds every keyword hit
+        for _, (account_name, keyword) in self._pattern_automaton.iter(clean_desc):
+            # Accounts for this category were pre-grouped at fetch time
+            matching_accounts = pattern_accounts.get(account_name)
+
+            if matching_accounts:
+                return {
+                    'account_name': matching_accounts[0].name,
+                    'account_id': matching_accounts[0].id,
+                    'confidence': 0.95,
+                    'method': 'pattern',
+                    'matched_keyword': keyword,
+                    'alternatives': [acc.name for acc in matching_accounts[1:3]]
+                }
+
         return None
     
-    def _fuzzy_match_accounts(self, description: str, accounts: List[Dict]) -> Optional[Dict[str, Any]]:
+    def _fuzzy_match_accounts(self, description: str, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Match using fuzzy string matching."""
-        account_names = [acc['name'] for acc in accounts]
-        
-        # Get best matches
-        matches = process.extract(description, account_names, scorer=fuzz.token_set_ratio, limit=5)
-        
-        if matches and matches[0][1] >= 70:  # 70% similarity threshold
-            best_match = matches[0]
-            matched_account = next(acc for acc in accounts if acc['name'] == best_match[0])
-            
+        accounts = entry['accounts']
+        account_names = entry['names']
+
+        # Exact-token fast path: a verbatim account-name token in the
+        # description beats running the edit-distance scorer at all
+        token_to_accounts = entry['token_to_accounts']
+        for word in description.split():
+            hits = token_to_accounts.get(word)
+            if hits:
+                return {
+                    'account_name': hits[0].name,
+                    'account_id': hits[0].id,
+                    'confidence': 0.99,
+                    'method': 'exact_token',
+                    'matched_keyword': word,
+                    'alternatives': [acc.name for acc in hits[1:4]]
+                }
+
+        # Choices were normalized at fetch time; only the query needs processing.
+        # score_cutoff lets RapidFuzz early-exit low-scoring candidates.
+        matches = process.extract(
+            rf_utils.default_process(description),
+            entry['names_processed'],
+            scorer=fuzz.token_set_ratio,
+            limit=5,
+            score_cutoff=70
+        )
+
+        if matches:
+            _, best_score, best_idx = matches[0]
+            matched_account = accounts[best_idx]
+
             return {
-                'account_name': matched_account['name'],
-                'account_id': matched_account.get('id'),
-                'confidence': best_match[1] / 100.0,
+                'account_name': matched_account.name,
+                'account_id': matched_account.id,
+                'confidence': best_score / 100.0,
                 'method': 'fuzzy',
-                'alternatives': [m[0] for m in matches[1:4]]
+                'alternatives': [account_names[m[2]] for m in matches[1:4]]
             }
-        
+
         return None
     
-    def _match_by_keywords(self, description: str, accounts: List[Dict]) -> Optional[Dict[str, Any]]:
-        """Match using keyword extraction from description."""
-        # Extract meaningful words (remove common words)
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for'}
-        words = [w for w in description.split() if w not in stop_words and len(w) > 2]
-        
+    def _get_keyword_index(self, accounts: List[Dict]) -> Dict[str, Any]:
+        """
+        Get (building if needed) the word -> account-index inverted index.
+
+        AccountManager returns the same cached list per company, so a
+        single-entry cache keyed on that list is enough to avoid
+        re-tokenizing the chart of accounts per description. For very
+        large charts a CSR integer encoding is built alongside so the
+        Numba-JIT scorer can be used when available.
+        """
+        key = (id(accounts), len(accounts))
+        if self._keyword_index_key != key:
+            index: Dict[str, List[int]] = {}
+            lowered_names = []
+            token_to_id: Dict[str, int] = {}
+            offsets = [0]
+            token_ids: List[int] = []
+            for idx, account in enumerate(accounts):
+                name_lower = account.name.lower()
+                lowered_names.append(name_lower)
+                for token in set(name_lower.split()):
+                    index.setdefault(token, []).append(idx)
+                    token_ids.append(token_to_id.setdefault(token, len(token_to_id)))
+                offsets.append(len(token_ids))
+            entry = {
+                'index': index,
+                'lowered_names': lowered_names,
+            }
+            if _NUMBA_AVAILABLE and len(accounts) >= _NUMBA_MIN_ACCOUNTS:
+                entry['token_to_id'] = token_to_id
+                entry['offsets'] = np.asarray(offsets, dtype=np.int32)
+                entry['token_ids'] = np.asarray(token_ids, dtype=np.int32)
+            self._keyword_index = entry
+            self._keyword_index_key = key
+        return self._keyword_index
+
+    def _match_by_keywords(self, desc_words: List[str], accounts: List[Dict]) -> Optional[Dict[str, Any]]:
+        """Match using keywords from an already-lowercased, pre-split description."""
+        # Keep meaningful words (cheap length check prunes before the set lookup)
+        words = [w for w in desc_words if len(w) > 2 and w not in _STOP_WORDS]
+
         if not words:
             return None
-        
-        # Score each account based on keyword matches
-        scores = []
-        for account in accounts:
-            account_name_lower = account['name'].lower()
-            score = sum(1 for word in words if word in account_name_lower)
-            if score > 0:
-                scores.append((account, score))
-        
+
+        kw_index = self._get_keyword_index(accounts)
+        lowered_names = kw_index['lowered_names']
+
+        if 'offsets' in kw_index:
+            # Large chart: integer-encode the query and score in the JIT kernel
+            token_to_id = kw_index['token_to_id']
+            query_ids = np.asarray(
+                [token_to_id[w] for w in words if w in token_to_id], dtype=np.int32
+            )
+            if query_ids.size == 0:
+                return None
+            jit_scores = _score_keywords_jit(
+                query_ids, kw_index['offsets'], kw_index['token_ids'], len(accounts)
+            )
+            scores = Counter({
+                int(idx): int(jit_scores[idx]) for idx in np.nonzero(jit_scores)[0]
+            })
+        else:
+            # Score accounts via the inverted index: O(words) dict lookups
+            index = kw_index['index']
+            scores = Counter(chain.from_iterable(index.get(w, ()) for w in words))
+
         if scores:
-            # Sort by score
-            scores.sort(key=lambda x: x[1], reverse=True)
-            best_account, best_score = scores[0]
-            
+            # Top-4 via a bounded heap rather than sorting every scored account
+            top = heapq.nlargest(4, scores.items(), key=operator.itemgetter(1))
+            best_idx, best_score = top[0]
+            best_account = accounts[best_idx]
+
             # Calculate confidence based on match ratio
             confidence = min(0.85, (best_score / len(words)) * 0.85)
-            
+
             return {
-                'account_name': best_account['name'],
-                'account_id': best_account.get('id'),
+                'account_name': best_account.name,
+                'account_id': best_account.id,
                 'confidence': confidence,
                 'method': 'keyword',
-                'matched_words': [w for w in words if w in best_account['name'].lower()],
-                'alternatives': [acc[0]['name'] for acc in scores[1:4]]
+                'matched_words': [w for w in words if w in lowered_names[best_idx]],
+                'alternatives': [accounts[idx].name for idx, _ in top[1:4]]
             }
-        
+
         return None
     
     def learn_from_match(self, description: str, account_name: str):
@@ -271,6 +573,11 @@ class AIAccountMatcher:
             self.match_history[clean_desc] = []
         
         self.match_history[clean_desc].append(account_name)
+
+        # Drop any memoized results for this description so corrections take effect
+        for key in [k for k in self._result_cache if k[0] == clean_desc]:
+            del self._result_cache[key]
+
         logger.info(f"Learned: '{clean_desc}' -> '{account_name}'")
     
     def get_match_suggestions(self, description: str, company_id: str, top_n: int = 5) -> List[Dict[str, Any]]:
@@ -1,29 +1,73 @@
 """
 PDF parser for extracting transaction data from bank statements, invoices, and receipts.
-Uses pdfplumber for text extraction and pytesseract for OCR when needed.
+Uses pdfminer.six for text extraction and pytesseract for OCR when needed.
 """
+import asyncio
 import logging
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any
-import pdfplumber
+import pandas as pd
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LTTextContainer
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Deletion table for amount strings: one C-level pass strips $, commas,
+# and spaces instead of chained str.replace calls
+_AMT_TRANS = str.maketrans('', '', '$, ')
+
+# Zero-copy line iteration: finditer yields one match per non-empty line
+# without materializing a list of the whole page
+_LINE_ITER_RE = re.compile(r'[^\n]+')
+
+# Cheap reject set: a line with no digit can't contain a date or amount,
+# so it never needs to enter the regex engine
+_DIGIT_SET = frozenset('0123456789')
+
+# Pages past this count are parsed in a process pool: regex parsing is
+# GIL-bound Python work, and only very large documents amortize the
+# pool's startup and pickling overhead
+_PROCESS_POOL_MIN_PAGES = 100
+_process_pool = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared parsing process pool, creating it on first use."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor()
+    return _process_pool
+
 
 class PDFParser:
     """Parse PDF files to extract transaction data."""
     
     def __init__(self):
-        """Initialize PDF parser."""
-        self.date_patterns = [
-            r'\d{1,2}/\d{1,2}/\d{2,4}',  # MM/DD/YYYY or M/D/YY
-            r'\d{1,2}-\d{1,2}-\d{2,4}',  # MM-DD-YYYY
-            r'\d{4}-\d{1,2}-\d{1,2}',    # YYYY-MM-DD
-        ]
+        """Initialize PDF parser. All patterns are compiled once here."""
+        # Single alternation covers YYYY-MM-DD (most specific first),
+        # MM/DD/YYYY, M/D/YY, and MM-DD-YYYY in one engine pass
+        self.date_pattern = r'\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'
+        self.date_re = re.compile(self.date_pattern)
         self.amount_pattern = r'\$?\s*-?\d{1,3}(?:,\d{3})*(?:\.\d{2})?'
-        
+        self.amount_re = re.compile(self.amount_pattern)
+        self.invoice_date_re = re.compile(
+            rf"(?:Invoice Date|Date):?\s*({self.date_pattern})", re.IGNORECASE
+        )
+        self.receipt_total_re = re.compile(
+            rf"(?:Total|Amount):?\s*({self.amount_pattern})", re.IGNORECASE
+        )
+        # One MULTILINE pass yields date, description, and trailing amount
+        # per statement line without Python-level line iteration
+        self.statement_line_re = re.compile(
+            rf'^.*?(?P<date>{self.date_pattern})\s*'
+            rf'(?P<desc>.+?)\s+'
+            rf'(?P<amount>{self.amount_pattern})\s*$',
+            re.MULTILINE
+        )
+
     async def parse_pdf(self, pdf_path: str, document_type: str = "general") -> List[Dict[str, Any]]:
         """
         Parse PDF and extract transactions.
@@ -40,69 +84,143 @@ class PDFParser:
         if not Path(pdf_path).exists():
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
         
-        transactions = []
-        
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    text = page.extract_text()
-                    
-                    if document_type == "bank_statement":
-                        page_transactions = self._parse_bank_statement(text)
-                    elif document_type == "invoice":
-                        page_transactions = self._parse_invoice(text)
-                    elif document_type == "receipt":
-                        page_transactions = self._parse_receipt(text)
+            # Two-stage pipeline: a producer thread streams page text out of
+            # pdfminer's lazy extract_pages generator while the event loop
+            # runs the regex parsing stage, so extraction and parsing of
+            # consecutive pages overlap. The bounded queue caps how far
+            # extraction can run ahead of parsing.
+            queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+            loop = asyncio.get_running_loop()
+
+            def _extract_pages_to_queue():
+                # The terminal item is enqueued no matter how extraction
+                # ends: None on success, the exception itself on failure
+                # (pdfminer routinely raises mid-iteration on corrupt or
+                # truncated statements). Without it the consumer would
+                # wait on the queue forever.
+                error = None
+                try:
+                    for page_num, layout in enumerate(extract_pages(pdf_path), 1):
+                        text = ''.join(
+                            element.get_text()
+                            for element in layout
+                            if isinstance(element, LTTextContainer)
+                        )
+                        asyncio.run_coroutine_threadsafe(
+                            queue.put((page_num, text)), loop
+                        ).result()
+                except BaseException as e:
+                    error = e
+                finally:
+                    asyncio.run_coroutine_threadsafe(queue.put(error), loop).result()
+
+            producer = asyncio.create_task(asyncio.to_thread(_extract_pages_to_queue))
+
+            transactions = []
+            pool_futures = []
+            extraction_error = None
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    if isinstance(item, BaseException):
+                        extraction_error = item
+                        break
+                    page_num, page_text = item
+                    if not page_text.strip():
+                        continue
+                    if page_num <= _PROCESS_POOL_MIN_PAGES:
+                        # Small documents parse inline, overlapped with extraction
+                        transactions.extend(
+                            self._process_page(page_text, page_num, document_type, pdf_path)
+                        )
                     else:
-                        page_transactions = self._parse_general(text)
-                    
-                    for txn in page_transactions:
-                        txn["source_page"] = page_num
-                        txn["source_file"] = pdf_path
-                    
-                    transactions.extend(page_transactions)
-            
+                        # Very large documents spread the GIL-bound regex work
+                        # across cores; page text is cheap to pickle
+                        pool_futures.append(loop.run_in_executor(
+                            _get_process_pool(),
+                            self._process_page,
+                            page_text, page_num, document_type, pdf_path
+                        ))
+            except BaseException:
+                # A parsing failure must not strand the producer blocked on
+                # the bounded queue: discard pages until its terminal item
+                # arrives, then re-raise the original error
+                while True:
+                    item = await queue.get()
+                    if item is None or isinstance(item, BaseException):
+                        break
+                await producer
+                raise
+
+            await producer
+            if extraction_error is not None:
+                raise extraction_error
+
+            if pool_futures:
+                for page_txns in await asyncio.gather(*pool_futures):
+                    transactions.extend(page_txns)
+
             logger.info(f"Extracted {len(transactions)} transactions from PDF")
             return transactions
-            
+
         except Exception as e:
             logger.error(f"Error parsing PDF: {str(e)}")
             raise
+
+    def _process_page(
+        self,
+        text: str,
+        page_num: int,
+        document_type: str,
+        pdf_path: str
+    ) -> List[Dict[str, Any]]:
+        """Parse one page's extracted text for the document type."""
+        if document_type == "bank_statement":
+            page_transactions = self._parse_bank_statement(text)
+        elif document_type == "invoice":
+            page_transactions = self._parse_invoice(text)
+        elif document_type == "receipt":
+            page_transactions = self._parse_receipt(text)
+        else:
+            page_transactions = self._parse_general(text)
+
+        for txn in page_transactions:
+            txn["source_page"] = page_num
+            txn["source_file"] = pdf_path
+
+        return page_transactions
     
     def _parse_bank_statement(self, text: str) -> List[Dict[str, Any]]:
         """Parse bank statement format."""
+        # Single engine pass extracts date, description, and trailing amount
+        matches = self.statement_line_re.findall(text)
+        if not matches:
+            return []
+
+        dates, descs, amounts = zip(*matches)
+
+        # Convert all amounts on the page in one vectorized pass instead
+        # of per-line translate + float
+        amount_values = pd.to_numeric(
+            pd.Series(amounts, dtype='string').str.translate(_AMT_TRANS),
+            errors='coerce'
+        ).fillna(0.0).tolist()
+
         transactions = []
-        lines = text.split('\n')
-        
-        for line in lines:
-            # Look for lines with date, description, and amount
-            date_match = None
-            for pattern in self.date_patterns:
-                date_match = re.search(pattern, line)
-                if date_match:
-                    break
-            
-            if not date_match:
-                continue
-            
-            # Extract amount
-            amount_matches = re.findall(self.amount_pattern, line)
-            if not amount_matches:
-                continue
-            
-            # Get description (text between date and amount)
-            date_end = date_match.end()
-            amount_start = line.find(amount_matches[-1])
-            description = line[date_end:amount_start].strip()
-            
+        normalize_date = self._normalize_date
+        for date_str, desc, amount in zip(dates, descs, amount_values):
+            description = desc.strip()
             if description:
                 transactions.append({
-                    "date": self._normalize_date(date_match.group()),
+                    "date": normalize_date(date_str),
                     "description": description,
-                    "amount": self._parse_amount(amount_matches[-1]),
+                    "amount": amount,
                     "type": "bank_transaction"
                 })
-        
+
         return transactions
     
     def _parse_invoice(self, text: str) -> List[Dict[str, Any]]:
@@ -111,16 +229,16 @@ class PDFParser:
         
         # Extract invoice date
         invoice_date = None
-        for pattern in self.date_patterns:
-            match = re.search(f"(?:Invoice Date|Date):?\\s*({pattern})", text, re.IGNORECASE)
-            if match:
-                invoice_date = self._normalize_date(match.group(1))
-                break
-        
+        match = self.invoice_date_re.search(text)
+        if match:
+            invoice_date = self._normalize_date(match.group(1))
+
         # Extract line items
-        lines = text.split('\n')
-        for line in lines:
-            amount_matches = re.findall(self.amount_pattern, line)
+        for line_match in _LINE_ITER_RE.finditer(text):
+            line = line_match.group()
+            if _DIGIT_SET.isdisjoint(line):
+                continue
+            amount_matches = self.amount_re.findall(line)
             if amount_matches and len(line.strip()) > 10:
                 # This might be a line item
                 transactions.append({
@@ -138,14 +256,12 @@ class PDFParser:
         
         # Extract receipt date
         receipt_date = None
-        for pattern in self.date_patterns:
-            match = re.search(pattern, text)
-            if match:
-                receipt_date = self._normalize_date(match.group())
-                break
-        
+        match = self.date_re.search(text)
+        if match:
+            receipt_date = self._normalize_date(match.group())
+
         # Extract total amount
-        total_match = re.search(f"(?:Total|Amount):?\\s*({self.amount_pattern})", text, re.IGNORECASE)
+        total_match = self.receipt_total_re.search(text)
         if total_match:
             transactions.append({
                 "date": receipt_date or datetime.now().strftime("%Y-%m-%d"),
@@ -159,17 +275,14 @@ class PDFParser:
     def _parse_general(self, text: str) -> List[Dict[str, Any]]:
         """Parse general document format."""
         transactions = []
-        lines = text.split('\n')
-        
-        for line in lines:
+
+        for line_match in _LINE_ITER_RE.finditer(text):
+            line = line_match.group()
+            if _DIGIT_SET.isdisjoint(line):
+                continue
             # Look for any line with both date and amount
-            date_match = None
-            for pattern in self.date_patterns:
-                date_match = re.search(pattern, line)
-                if date_match:
-                    break
-            
-            amount_matches = re.findall(self.amount_pattern, line)
+            date_match = self.date_re.search(line)
+            amount_matches = self.amount_re.findall(line)
             
             if date_match and amount_matches:
                 transactions.append({
@@ -183,25 +296,29 @@ class PDFParser:
     
     def _normalize_date(self, date_str: str) -> str:
         """Normalize date to YYYY-MM-DD format."""
+        # Inputs come from the date regex, so the shape is known: either
+        # YYYY-MM-DD (returned as-is) or M/D/Y | M-D-Y parsed by slicing --
+        # no strptime on the per-transaction hot path.
         try:
-            # Try different date formats
-            for fmt in ["%m/%d/%Y", "%m/%d/%y", "%m-%d-%Y", "%Y-%m-%d"]:
-                try:
-                    dt = datetime.strptime(date_str, fmt)
-                    return dt.strftime("%Y-%m-%d")
-                except ValueError:
-                    continue
-            
-            # If all fail, return original
-            return date_str
-        except:
+            if len(date_str) >= 5 and date_str[4] == '-':
+                return date_str  # Already ISO
+
+            sep = '/' if '/' in date_str else '-'
+            month, day, year = date_str.split(sep, 2)
+            y, m, d = int(year), int(month), int(day)
+            if y < 100:  # Two-digit year
+                y = 2000 + y if y < 70 else 1900 + y
+            return f"{y:04d}-{m:02d}-{d:02d}"
+        except (ValueError, IndexError):
             return date_str
     
     def _parse_amount(self, amount_str: str) -> float:
         """Parse amount string to float."""
+        # Cheap reject before float(): raising/unwinding an exception is
+        # far more expensive than this set check when misses are common
+        if not amount_str or _DIGIT_SET.isdisjoint(amount_str):
+            return 0.0
         try:
-            # Remove $ and commas
-            clean_amount = amount_str.replace('$', '').replace(',', '').strip()
-            return float(clean_amount)
-        except:
+            return float(amount_str.translate(_AMT_TRANS))
+        except ValueError:
             return 0.0
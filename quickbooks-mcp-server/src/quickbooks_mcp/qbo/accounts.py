@@ -2,91 +2,184 @@
 QuickBooks Online account management.
 Handles chart of accounts operations.
 """
+import asyncio
 import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from weakref import WeakValueDictionary
 from typing import List, Dict, Any, Optional
 from .client import QBOClient
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class Account:
+    """One chart-of-accounts row. Slotted: a full chart holds hundreds of
+    these, and slots skip the per-instance dict that plain dicts and
+    ordinary classes would pay for."""
+    id: str
+    name: str
+    type: str
+    sub_type: str = ''
+    active: bool = True
+    classification: str = ''
+    account_number: str = ''
+    current_balance: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict view for JSON/tool-response boundaries."""
+        return asdict(self)
+
+    @classmethod
+    def from_qbo(cls, acc: Dict[str, Any]) -> 'Account':
+        """Build from a raw QBO Account response row."""
+        return cls(
+            id=acc['Id'],
+            name=acc['Name'],
+            type=acc['AccountType'],
+            sub_type=acc.get('AccountSubType', ''),
+            active=acc.get('Active', True),
+            classification=acc.get('Classification', ''),
+            account_number=acc.get('AcctNum', ''),
+            current_balance=float(acc.get('CurrentBalance', 0))
+        )
+
+
 class AccountManager:
     """Manage QuickBooks Online chart of accounts."""
-    
+
+    # Map account type to QuickBooks types
+    TYPE_MAPPING = {
+        'expense': ['Expense', 'Cost of Goods Sold', 'Other Expense'],
+        'income': ['Income', 'Other Income'],
+        'asset': ['Bank', 'Other Current Asset', 'Fixed Asset', 'Other Asset'],
+        'liability': ['Accounts Payable', 'Credit Card', 'Other Current Liability', 'Long Term Liability'],
+        'equity': ['Equity']
+    }
+
+    # Reverse lookup: QuickBooks AccountType -> filter category
+    _QB_TYPE_TO_CATEGORY = {
+        qb_type: category
+        for category, qb_types in TYPE_MAPPING.items()
+        for qb_type in qb_types
+    }
+
+    # One manager (and thus one warm account cache) per client; weak
+    # values let managers die with their owners
+    _instances: 'WeakValueDictionary[int, AccountManager]' = WeakValueDictionary()
+
+    @classmethod
+    def get(cls, qbo_client: QBOClient) -> 'AccountManager':
+        """
+        Return the shared manager for this client, creating it on first use.
+
+        Handlers that build a TransactionManager per request would
+        otherwise each get a fresh AccountManager and re-query the chart
+        of accounts; sharing by client keeps the cache hot.
+        """
+        manager = cls._instances.get(id(qbo_client))
+        if manager is None:
+            manager = cls(qbo_client)
+            cls._instances[id(qbo_client)] = manager
+        return manager
+
     def __init__(self, qbo_client: QBOClient):
         """
         Initialize account manager.
-        
+
         Args:
             qbo_client: QBOClient instance
         """
         self.client = qbo_client
-        self.account_cache = {}  # Cache accounts by company_id
-        
+        # company_id -> (built_at, prebuilt lookup structures); entries
+        # expire after the TTL so renamed or added accounts show up
+        # without a restart. The per-company lock stops a thundering herd
+        # of concurrent rebuilds.
+        self.account_cache: Dict[str, tuple] = {}
+        self._cache_ttl = 300.0  # seconds
+        self._cache_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    def _peek_cache(self, company_id: str) -> Optional[Dict[str, Any]]:
+        """Return the company's cache dict if present and fresh."""
+        entry = self.account_cache.get(company_id)
+        if entry and time.monotonic() - entry[0] < self._cache_ttl:
+            return entry[1]
+        return None
+
+    def invalidate(self, company_id: str):
+        """Drop one company's cached chart after an account mutation."""
+        self.account_cache.pop(company_id, None)
+
+    async def _get_account_cache(self, company_id: str) -> Dict[str, Any]:
+        """
+        Get (or build) the per-company account cache.
+
+        The chart of accounts is small and slow-changing, so it is fetched
+        once per company with a single query and indexed in memory; every
+        typed or by-name lookup is then served without another round-trip.
+        """
+        cache = self._peek_cache(company_id)
+        if cache is not None:
+            return cache
+
+        async with self._cache_locks[company_id]:
+            cache = self._peek_cache(company_id)
+            if cache is not None:
+                return cache
+            return await self._build_account_cache(company_id)
+
+    async def _build_account_cache(self, company_id: str) -> Dict[str, Any]:
+        """Fetch the chart and index it; caller holds the company lock."""
+        response = await self.client.query(company_id, "SELECT * FROM Account")
+
+        accounts = []
+        if 'QueryResponse' in response and 'Account' in response['QueryResponse']:
+            accounts = [Account.from_qbo(acc) for acc in response['QueryResponse']['Account']]
+
+        by_type = {category: [] for category in self.TYPE_MAPPING}
+        for acc in accounts:
+            category = self._QB_TYPE_TO_CATEGORY.get(acc.type)
+            if category:
+                by_type[category].append(acc)
+
+        cache = {
+            'all': accounts,
+            'by_id': {acc.id: acc for acc in accounts},
+            'by_name_lower': {acc.name.lower(): acc for acc in accounts},
+            'by_type': by_type
+        }
+        self.account_cache[company_id] = (time.monotonic(), cache)
+
+        logger.info(f"Cached {len(accounts)} accounts for company {company_id}")
+        return cache
+
     async def get_chart_of_accounts(
         self,
         company_id: str,
         account_type: str = 'all'
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Account]:
         """
         Get chart of accounts from QuickBooks Online.
-        
+
         Args:
             company_id: QuickBooks company ID
             account_type: Filter by type (all, expense, income, asset, liability, equity)
-            
+
         Returns:
             List of accounts with name, type, and ID
         """
         logger.info(f"Fetching chart of accounts for company {company_id} (type: {account_type})")
-        
+
         try:
-            # Check cache first
-            cache_key = f"{company_id}_{account_type}"
-            if cache_key in self.account_cache:
-                logger.info("Returning cached chart of accounts")
-                return self.account_cache[cache_key]
-            
-            # Build query based on account type
+            cache = await self._get_account_cache(company_id)
+
             if account_type == 'all':
-                query = "SELECT * FROM Account"
-            else:
-                # Map account type to QuickBooks types
-                type_mapping = {
-                    'expense': ['Expense', 'Cost of Goods Sold', 'Other Expense'],
-                    'income': ['Income', 'Other Income'],
-                    'asset': ['Bank', 'Other Current Asset', 'Fixed Asset', 'Other Asset'],
-                    'liability': ['Accounts Payable', 'Credit Card', 'Other Current Liability', 'Long Term Liability'],
-                    'equity': ['Equity']
-                }
-                
-                qb_types = type_mapping.get(account_type, ['Expense'])
-                type_filter = " OR ".join([f"AccountType = '{t}'" for t in qb_types])
-                query = f"SELECT * FROM Account WHERE {type_filter}"
-            
-            # Execute query
-            response = await self.client.query(company_id, query)
-            
-            # Parse response
-            accounts = []
-            if 'QueryResponse' in response and 'Account' in response['QueryResponse']:
-                for acc in response['QueryResponse']['Account']:
-                    accounts.append({
-                        'id': acc['Id'],
-                        'name': acc['Name'],
-                        'type': acc['AccountType'],
-                        'sub_type': acc.get('AccountSubType', ''),
-                        'active': acc.get('Active', True),
-                        'classification': acc.get('Classification', ''),
-                        'account_number': acc.get('AcctNum', ''),
-                        'current_balance': float(acc.get('CurrentBalance', 0))
-                    })
-            
-            # Cache the results
-            self.account_cache[cache_key] = accounts
-            
-            logger.info(f"Retrieved {len(accounts)} accounts")
-            return accounts
-            
+                return cache['all']
+
+            return cache['by_type'].get(account_type, [])
+
         except Exception as e:
             logger.error(f"Error fetching chart of accounts: {str(e)}")
             raise
@@ -95,7 +188,7 @@ class AccountManager:
         self,
         company_id: str,
         account_name: str
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[Account]:
         """
         Get account by name.
         
@@ -107,19 +200,19 @@ class AccountManager:
             Account details or None if not found
         """
         try:
-            # Get all accounts
-            accounts = await self.get_chart_of_accounts(company_id, 'all')
-            
-            # Search for exact match first
-            for acc in accounts:
-                if acc['name'].lower() == account_name.lower():
-                    return acc
-            
-            # Try partial match
-            for acc in accounts:
-                if account_name.lower() in acc['name'].lower():
+            cache = await self._get_account_cache(company_id)
+            name_lower = account_name.lower()
+
+            # Exact match is a single dict probe
+            account = cache['by_name_lower'].get(name_lower)
+            if account is not None:
+                return account
+
+            # Fall back to one substring pass for partial matches
+            for acc_name, acc in cache['by_name_lower'].items():
+                if name_lower in acc_name:
                     return acc
-            
+
             logger.warning(f"Account not found: {account_name}")
             return None
             
@@ -131,7 +224,7 @@ class AccountManager:
         self,
         company_id: str,
         account_id: str
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[Account]:
         """
         Get account by ID.
         
@@ -146,22 +239,107 @@ class AccountManager:
             response = await self.client.get_entity(company_id, 'Account', account_id)
             
             if 'Account' in response:
-                acc = response['Account']
-                return {
-                    'id': acc['Id'],
-                    'name': acc['Name'],
-                    'type': acc['AccountType'],
-                    'sub_type': acc.get('AccountSubType', ''),
-                    'active': acc.get('Active', True),
-                    'current_balance': float(acc.get('CurrentBalance', 0))
-                }
+                return Account.from_qbo(response['Account'])
             
             return None
             
         except Exception as e:
             logger.error(f"Error fetching account by ID: {str(e)}")
             return None
-    
+
+    async def get_accounts_by_ids(
+        self,
+        company_id: str,
+        account_ids: List[str]
+    ) -> Dict[str, Account]:
+        """
+        Resolve many account IDs in a single query.
+
+        Args:
+            company_id: QuickBooks company ID
+            account_ids: Account IDs to resolve
+
+        Returns:
+            Dict mapping account ID to account; missing IDs are omitted
+        """
+        try:
+            # Serve what we can from the cache and only query the rest
+            cache = self._peek_cache(company_id)
+            by_id = cache['by_id'] if cache else {}
+            resolved = {}
+            missing = []
+            for account_id in account_ids:
+                account = by_id.get(account_id)
+                if account is not None:
+                    resolved[account_id] = account
+                else:
+                    missing.append(account_id)
+
+            if missing:
+                ids_sql = ",".join(f"'{self.client._escape(i)}'" for i in missing)
+                query = f"SELECT * FROM Account WHERE Id IN ({ids_sql})"
+                response = await self.client.query(company_id, query)
+
+                if 'QueryResponse' in response and 'Account' in response['QueryResponse']:
+                    for acc in response['QueryResponse']['Account']:
+                        account = Account.from_qbo(acc)
+                        resolved[account.id] = account
+
+            return resolved
+
+        except Exception as e:
+            logger.error(f"Error fetching accounts by IDs: {str(e)}")
+            return {}
+
+    async def get_accounts_by_names(
+        self,
+        company_id: str,
+        account_names: List[str]
+    ) -> Dict[str, Account]:
+        """
+        Resolve many account names in a single query.
+
+        Args:
+            company_id: QuickBooks company ID
+            account_names: Account names to resolve
+
+        Returns:
+            Dict mapping requested name to account; missing names are omitted
+        """
+        try:
+            # Serve what we can from the cache and only query the rest
+            cache = self._peek_cache(company_id)
+            by_name = cache['by_name_lower'] if cache else {}
+            resolved = {}
+            missing = []
+            for name in account_names:
+                account = by_name.get(name.lower())
+                if account is not None:
+                    resolved[name] = account
+                else:
+                    missing.append(name)
+
+            if missing:
+                names_sql = ",".join(f"'{self.client._escape(n)}'" for n in missing)
+                query = f"SELECT * FROM Account WHERE Name IN ({names_sql})"
+                response = await self.client.query(company_id, query)
+
+                if 'QueryResponse' in response and 'Account' in response['QueryResponse']:
+                    found = {
+                        acc['Name'].lower(): Account.from_qbo(acc)
+                        for acc in response['QueryResponse']['Account']
+                    }
+                    for name in missing:
+                        account = found.get(name.lower())
+                        if account is not None:
+                            resolved[name] = account
+
+            return resolved
+
+        except Exception as e:
+            logger.error(f"Error fetching accounts by names: {str(e)}")
+            return {}
+
     async def create_account(
         self,
         company_id: str,
@@ -199,8 +377,8 @@ class AccountManager:
                 acc = response['Account']
                 logger.info(f"Created account: {acc['Name']} (ID: {acc['Id']})")
                 
-                # Clear cache
-                self.account_cache.clear()
+                # Only this company's chart changed
+                self.invalidate(company_id)
                 
                 return {
                     'id': acc['Id'],
@@ -221,7 +399,7 @@ class AccountManager:
         company_id: str,
         search_term: str,
         account_type: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Account]:
         """
         Search accounts by name or description.
         
@@ -244,7 +422,7 @@ class AccountManager:
             search_lower = search_term.lower()
             matching = [
                 acc for acc in accounts
-                if search_lower in acc['name'].lower()
+                if search_lower in acc.name.lower()
             ]
             
             return matching
@@ -258,19 +436,19 @@ class AccountManager:
         self.account_cache.clear()
         logger.info("Account cache cleared")
     
-    async def get_expense_accounts(self, company_id: str) -> List[Dict[str, Any]]:
+    async def get_expense_accounts(self, company_id: str) -> List[Account]:
         """Get all expense accounts."""
         return await self.get_chart_of_accounts(company_id, 'expense')
     
-    async def get_income_accounts(self, company_id: str) -> List[Dict[str, Any]]:
+    async def get_income_accounts(self, company_id: str) -> List[Account]:
         """Get all income accounts."""
         return await self.get_chart_of_accounts(company_id, 'income')
     
-    async def get_asset_accounts(self, company_id: str) -> List[Dict[str, Any]]:
+    async def get_asset_accounts(self, company_id: str) -> List[Account]:
         """Get all asset accounts."""
         return await self.get_chart_of_accounts(company_id, 'asset')
     
-    async def get_bank_accounts(self, company_id: str) -> List[Dict[str, Any]]:
+    async def get_bank_accounts(self, company_id: str) -> List[Account]:
         """Get all bank accounts."""
         try:
             query = "SELECT * FROM Account WHERE AccountType = 'Bank'"
@@ -278,14 +456,7 @@ class AccountManager:
             
             accounts = []
             if 'QueryResponse' in response and 'Account' in response['QueryResponse']:
-                for acc in response['QueryResponse']['Account']:
-                    accounts.append({
-                        'id': acc['Id'],
-                        'name': acc['Name'],
-                        'type': acc['AccountType'],
-                        'current_balance': float(acc.get('CurrentBalance', 0)),
-                        'account_number': acc.get('AcctNum', '')
-                    })
+                accounts = [Account.from_qbo(acc) for acc in response['QueryResponse']['Account']]
             
             return accounts
             
@@ -2,8 +2,10 @@
 QuickBooks Online OAuth 2.0 authentication manager.
 Handles token management, refresh, and validation.
 """
+import asyncio
 import os
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from intuitlib.client import AuthClient
@@ -36,18 +38,32 @@ class QBOAuthManager:
         self.access_token = os.getenv("QBO_ACCESS_TOKEN")
         self.refresh_token = os.getenv("QBO_REFRESH_TOKEN")
         self.token_expiry = self._parse_token_expiry(os.getenv("QBO_TOKEN_EXPIRY"))
+        # Monotonic refresh deadline with the 5-minute margin pre-subtracted;
+        # the hot-path expiry check is then a single float compare
+        self._token_deadline = self._deadline_from_expiry(self.token_expiry)
+        # Serializes refreshes so concurrent requests share one round-trip
+        self._refresh_lock = asyncio.Lock()
         
         logger.info(f"QBO Auth Manager initialized (environment: {self.environment})")
     
     def _parse_token_expiry(self, expiry_str: Optional[str]) -> Optional[datetime]:
         """Parse token expiry string to datetime."""
-        if not expiry_str:
+        # Shape check up front so a malformed env var doesn't pay for
+        # exception unwinding; fromisoformat needs at least YYYY-MM-DD
+        if not expiry_str or len(expiry_str) < 10 or not expiry_str[:4].isdigit():
             return None
         try:
             return datetime.fromisoformat(expiry_str)
-        except:
+        except ValueError:
             return None
     
+    def _deadline_from_expiry(self, expiry: Optional[datetime]) -> float:
+        """Convert a wall-clock expiry to a monotonic refresh deadline."""
+        if expiry is None:
+            # No known expiry: never trigger a refresh (matches prior behavior)
+            return float('inf')
+        return time.monotonic() + (expiry - datetime.now()).total_seconds() - 300.0
+    
     def get_authorization_url(self, state: str = "security_token") -> str:
         """
         Get OAuth authorization URL for user to authenticate.
@@ -73,6 +89,7 @@ class QBOAuthManager:
             self.access_token = self.auth_client.access_token
             self.refresh_token = self.auth_client.refresh_token
             self.token_expiry = datetime.now() + timedelta(seconds=3600)
+            self._token_deadline = time.monotonic() + 3600.0 - 300.0
             
             logger.info(f"Successfully exchanged auth code for tokens (realm: {realm_id})")
             
@@ -97,6 +114,7 @@ class QBOAuthManager:
             self.access_token = self.auth_client.access_token
             self.refresh_token = self.auth_client.refresh_token
             self.token_expiry = datetime.now() + timedelta(seconds=3600)
+            self._token_deadline = time.monotonic() + 3600.0 - 300.0
             
             logger.info("Successfully refreshed access token")
             return self.access_token
@@ -115,10 +133,15 @@ class QBOAuthManager:
                 "No access token available. Please authenticate first using get_authorization_url()"
             )
         
-        # Check if token is expired or about to expire (within 5 minutes)
-        if self.token_expiry and datetime.now() >= (self.token_expiry - timedelta(minutes=5)):
-            logger.info("Access token expired or expiring soon, refreshing...")
-            await self.refresh_access_token()
+        # Check if token is expired or about to expire (5-min margin is
+        # baked into the deadline, so this is one float compare per request)
+        if time.monotonic() >= self._token_deadline:
+            async with self._refresh_lock:
+                # Re-check under the lock: another request may have already
+                # refreshed while this one was waiting
+                if time.monotonic() >= self._token_deadline:
+                    logger.info("Access token expired or expiring soon, refreshing...")
+                    await self.refresh_access_token()
         
         return self.access_token
     
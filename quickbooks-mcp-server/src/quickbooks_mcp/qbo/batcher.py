@@ -0,0 +1,156 @@
+"""
+Background batcher that coalesces individual QBO creates into /batch calls.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from weakref import WeakValueDictionary
+from typing import Any, Dict, List, Optional
+
+from .client import QBOClient
+
+logger = logging.getLogger(__name__)
+
+
+class QBOBatchFault(Exception):
+    """One operation inside an otherwise-successful /batch came back faulted."""
+
+
+class QBOBatcher:
+    """
+    Coalesce single create calls into shared QBO /batch requests.
+
+    Callers submit one (company_id, entity_type, payload) at a time and
+    await the created entity; a background task drains the queue and
+    flushes a batch once 30 operations are waiting or the oldest has
+    waited MAX_QUEUE_TIME. Interactive single creates and bulk imports
+    running at the same time therefore share the same wire batches, so
+    the /batch endpoint stays full under mixed workloads instead of each
+    caller paying its own round trip.
+    """
+
+    MAX_BATCH_SIZE = 30      # QBO's per-request /batch operation cap
+    MAX_QUEUE_TIME = 0.5     # seconds the oldest queued op waits for company
+    FLUSH_CONCURRENCY = 4    # concurrent /batch requests in flight
+
+    _instances: 'WeakValueDictionary[int, QBOBatcher]' = WeakValueDictionary()
+
+    @classmethod
+    def get(cls, qbo_client: QBOClient) -> 'QBOBatcher':
+        """
+        Shared batcher for a given client.
+
+        Coalescing only works if every manager funnels through the same
+        queue, so instances are shared per client object like
+        AccountManager's cache.
+        """
+        batcher = cls._instances.get(id(qbo_client))
+        if batcher is None:
+            batcher = cls(qbo_client)
+            cls._instances[id(qbo_client)] = batcher
+        return batcher
+
+    def __init__(self, qbo_client: QBOClient):
+        self.client = qbo_client
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._flush_gate = asyncio.Semaphore(self.FLUSH_CONCURRENCY)
+        self._runner: Optional[asyncio.Task] = None
+        # Keep strong references to in-flight flush tasks so they are
+        # not garbage-collected mid-request
+        self._flushes: set = set()
+
+    async def process(
+        self,
+        company_id: str,
+        entity_type: str,
+        payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Queue one create and await its entity from the merged batch.
+
+        Raises QBOBatchFault if QBO rejects this operation, or whatever
+        the underlying /batch request raised if the whole batch failed.
+        """
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((company_id, entity_type, payload, future))
+        return await future
+
+    async def aclose(self):
+        """Stop the background runner and fail anything still queued."""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        while not self._queue.empty():
+            *_, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError('QBOBatcher closed'))
+
+    async def _run(self):
+        """Drain the queue into ≤30-op buckets, flushing on size or age."""
+        loop = asyncio.get_running_loop()
+        while True:
+            bucket = [await self._queue.get()]
+            deadline = loop.time() + self.MAX_QUEUE_TIME
+            while len(bucket) < self.MAX_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    bucket.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # /batch is per company; a mixed bucket splits into one
+            # request per realm
+            by_company: Dict[str, List[tuple]] = defaultdict(list)
+            for entry in bucket:
+                by_company[entry[0]].append(entry)
+            for company_id, entries in by_company.items():
+                task = asyncio.create_task(self._flush(company_id, entries))
+                self._flushes.add(task)
+                task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, company_id: str, entries: List[tuple]):
+        """Submit one /batch request and resolve each entry's future."""
+        async with self._flush_gate:
+            operations = [
+                {'bId': str(i), 'operation': 'create', entity_type: payload}
+                for i, (_, entity_type, payload, _) in enumerate(entries)
+            ]
+            try:
+                response = await self.client.batch(company_id, operations)
+            except Exception as e:
+                logger.error(f"Batch flush failed: {str(e)}")
+                for *_, future in entries:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            # QBO does not guarantee response order; fold back by bId
+            by_bid = {
+                item.get('bId'): item
+                for item in response.get('BatchItemResponse', [])
+            }
+            for i, (_, entity_type, _, future) in enumerate(entries):
+                if future.done():
+                    continue
+                item = by_bid.get(str(i))
+                if item is None:
+                    future.set_exception(
+                        QBOBatchFault('No response for batch operation')
+                    )
+                    continue
+                fault = item.get('Fault')
+                if fault:
+                    message = fault.get('Error', [{}])[0].get(
+                        'Message', 'Batch operation failed'
+                    )
+                    future.set_exception(QBOBatchFault(message))
+                else:
+                    future.set_result(item.get(entity_type, {}))
@@ -2,13 +2,138 @@
 QuickBooks Online API client.
 Handles all API requests to QuickBooks Online.
 """
+import asyncio
 import logging
-from typing import Any, Dict, Optional
+import random
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Optional, Tuple
 import httpx
 from .auth import QBOAuthManager
 
 logger = logging.getLogger(__name__)
 
+# msgspec and orjson are optional; either C decoder parses QBO's large
+# report payloads several times faster than the stdlib json path behind
+# response.json(). Preference order: msgspec, then orjson, then stdlib.
+try:
+    import msgspec.json
+    _decode_json = msgspec.json.decode
+except ImportError:
+    try:
+        import orjson
+        _decode_json = orjson.loads
+    except ImportError:
+        _decode_json = None
+
+# ijson is optional; when present, stream_report decodes report rows
+# incrementally off the wire instead of buffering the whole payload and
+# the parsed tree at once.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Shared pool/timeout settings for the long-lived client. A tight connect
+# timeout fails fast on network trouble without cutting slow report
+# responses short.
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=100)
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+
+class QBOThrottleError(Exception):
+    """Raised on HTTP 429/503; carries the server's Retry-After hint."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QBOTransientError(Exception):
+    """Raised on HTTP 502/504 or a dropped connection; safe to retry."""
+
+
+class QBORateLimiter:
+    """
+    Sliding-window quota plus AIMD concurrency control for QBO calls.
+
+    QBO allows roughly 40 requests per minute per realm; the per-company
+    window never exceeds that. On top of it, an adaptive in-flight limit
+    grows additively (+0.5) while response latency stays under target and
+    halves on a throttle signal (429/502/503), so bursts back off before
+    the server starts rejecting whole batches.
+    """
+
+    WINDOW = 60.0            # seconds
+    MAX_PER_WINDOW = 40      # QBO per-realm request quota
+    LATENCY_TARGET = 2.0     # seconds; EMA below this widens the limit
+
+    def __init__(self):
+        self._timestamps: Dict[str, deque] = defaultdict(deque)
+        self._limit = 8.0
+        self._min_limit = 1.0
+        self._max_limit = 32.0
+        self._inflight = 0
+        self._latency_ema = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self, company_id: str):
+        """Wait for an in-flight slot and a free quota slot."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._inflight < int(self._limit))
+            self._inflight += 1
+
+        stamps = self._timestamps[company_id]
+        while True:
+            now = time.monotonic()
+            while stamps and now - stamps[0] >= self.WINDOW:
+                stamps.popleft()
+            if len(stamps) < self.MAX_PER_WINDOW:
+                stamps.append(now)
+                return
+            # Sleep until the oldest request ages out of the window
+            await asyncio.sleep(self.WINDOW - (now - stamps[0]))
+
+    async def release(self, elapsed: float, throttled: bool):
+        """Return the slot and adapt the limit from the outcome."""
+        async with self._cond:
+            self._inflight -= 1
+            if throttled:
+                # Multiplicative decrease on throttle signals
+                self._limit = max(self._min_limit, self._limit * 0.5)
+            else:
+                if self._latency_ema == 0.0:
+                    self._latency_ema = elapsed
+                else:
+                    self._latency_ema = 0.8 * self._latency_ema + 0.2 * elapsed
+                if self._latency_ema < self.LATENCY_TARGET:
+                    # Additive increase while responses stay fast
+                    self._limit = min(self._max_limit, self._limit + 0.5)
+            self._cond.notify_all()
+
+
+# Shared across all QBOClient instances: the quota is per realm, not
+# per client object
+_rate_limiter = QBORateLimiter()
+
+
+class _AsyncByteReader:
+    """Minimal async read() adapter: httpx byte stream -> ijson input."""
+
+    def __init__(self, aiter):
+        self._aiter = aiter
+
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes with read(0) just to sniff bytes vs str and
+        # discards the result; answering it from the iterator would
+        # swallow the first body chunk
+        if size == 0:
+            return b''
+        try:
+            return await self._aiter.__anext__()
+        except StopAsyncIteration:
+            return b''
+
 
 class QBOClient:
     """QuickBooks Online API client."""
@@ -20,12 +145,49 @@ class QBOClient:
         """Initialize QBO client with auth manager."""
         self.auth_manager = auth_manager
         self.base_url = (
-            self.BASE_URL_PRODUCTION 
-            if auth_manager.environment == "production" 
+            self.BASE_URL_PRODUCTION
+            if auth_manager.environment == "production"
             else self.BASE_URL_SANDBOX
         )
+        # One pooled client for the lifetime of this QBOClient: keep-alive
+        # connections avoid a fresh TCP/TLS handshake on every API call
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=HTTP_TIMEOUT,
+            limits=HTTP_LIMITS
+        )
+        # Per-company URL prefixes and the static header pairs, built once
+        # instead of per request
+        self._company_urls: Dict[str, str] = {}
+        self._base_headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json"
+        }
+        # Bound-method table replaces the per-request if/elif method chain
+        self._dispatch = {
+            "GET": self._client.get,
+            "POST": self._client.post,
+            "PUT": self._client.put,
+            "DELETE": self._client.delete
+        }
         logger.info(f"QBO Client initialized (base URL: {self.base_url})")
+
+    async def aclose(self):
+        """Close the pooled HTTP client."""
+        await self._client.aclose()
+
+    async def __aenter__(self) -> 'QBOClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
     
+    # Retry schedule for transient failures: exponential backoff with
+    # full jitter, capped, honoring any Retry-After the server sends
+    _MAX_ATTEMPTS = 5
+    _BACKOFF_BASE = 1.0    # seconds
+    _BACKOFF_CAP = 30.0    # seconds
+
     async def _make_request(
         self,
         method: str,
@@ -34,41 +196,127 @@ class QBOClient:
         data: Optional[Dict] = None,
         params: Optional[Dict] = None
     ) -> Dict[str, Any]:
-        """Make authenticated request to QuickBooks API."""
-        access_token = await self.auth_manager.get_valid_access_token()
-        
-        url = f"{self.base_url}/{company_id}/{endpoint}"
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
-        
-        async with httpx.AsyncClient() as client:
+        """
+        Make authenticated request to QuickBooks API.
+
+        Throttles (429/503) and transient gateway errors (502/504,
+        dropped connections) are retried with jittered exponential
+        backoff, so a momentary quota breach mid-batch surfaces as a
+        latency bump rather than a failed transaction.
+        """
+        for attempt in range(self._MAX_ATTEMPTS):
             try:
-                if method == "GET":
-                    response = await client.get(url, headers=headers, params=params)
-                elif method == "POST":
-                    response = await client.post(url, headers=headers, json=data)
-                elif method == "PUT":
-                    response = await client.put(url, headers=headers, json=data)
-                elif method == "DELETE":
-                    response = await client.delete(url, headers=headers)
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-                raise
-            except Exception as e:
-                logger.error(f"Request failed: {str(e)}")
-                raise
+                return await self._request_once(method, company_id, endpoint, data, params)
+            except (QBOThrottleError, QBOTransientError) as e:
+                if attempt == self._MAX_ATTEMPTS - 1:
+                    raise
+                delay = random.uniform(0.5, 1.0) * min(
+                    self._BACKOFF_CAP, self._BACKOFF_BASE * (2 ** attempt)
+                )
+                retry_after = getattr(e, 'retry_after', 0.0)
+                if retry_after > 0:
+                    delay = max(delay, retry_after)
+                logger.warning(
+                    f"Retryable error on {method} {endpoint} "
+                    f"(attempt {attempt + 1}/{self._MAX_ATTEMPTS}): {e}; "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def _request_once(
+        self,
+        method: str,
+        company_id: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """One request attempt; raises typed errors for retryable failures."""
+        access_token = await self.auth_manager.get_valid_access_token()
+
+        company_base = self._company_urls.setdefault(
+            company_id, f"{self.base_url}/{company_id}"
+        )
+        url = f"{company_base}/{endpoint}"
+        headers = {**self._base_headers, "Authorization": f"Bearer {access_token}"}
+
+        request_fn = self._dispatch.get(method)
+        if request_fn is None:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        kwargs = {"headers": headers}
+        if params is not None:
+            kwargs["params"] = params
+        if data is not None and method in ("POST", "PUT"):
+            kwargs["json"] = data
+
+        await _rate_limiter.acquire(company_id)
+        start = time.monotonic()
+        throttled = False
+        try:
+            response = await request_fn(url, **kwargs)
+            status = response.status_code
+            throttled = status in (429, 502, 503)
+
+            if status in (429, 503):
+                raise QBOThrottleError(
+                    f"HTTP {status} from QBO",
+                    retry_after=self._parse_retry_after(response.headers.get('Retry-After'))
+                )
+            if status in (502, 504):
+                raise QBOTransientError(f"HTTP {status} from QBO")
+
+            response.raise_for_status()
+            if _decode_json is not None:
+                return _decode_json(response.content)
+            return response.json()
+
+        except httpx.TransportError as e:
+            # Reset/timed-out connections are as retryable as a 502
+            throttled = True
+            raise QBOTransientError(f"Transport error: {e}") from e
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
+            raise
+        except (QBOThrottleError, QBOTransientError):
+            raise
+        except Exception as e:
+            logger.error(f"Request failed: {str(e)}")
+            raise
+        finally:
+            await _rate_limiter.release(time.monotonic() - start, throttled)
     
-    async def query(self, company_id: str, query: str) -> Dict[str, Any]:
-        """Execute a QuickBooks query."""
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> float:
+        """
+        Seconds from a Retry-After header.
+
+        RFC 9110 also allows an HTTP-date form; anything non-numeric
+        (including a missing header) falls back to 0.0 so the jittered
+        backoff schedule alone drives the delay.
+        """
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        """Escape a string literal for interpolation into a QBO query."""
+        return str(value).replace("\\", "\\\\").replace("'", "\\'")
+
+    async def query(self, company_id: str, query: str, **params: Any) -> Dict[str, Any]:
+        """
+        Execute a QuickBooks query.
+
+        Literals can be supplied as :name placeholders with keyword
+        values; they are escaped and quoted before substitution, so an
+        apostrophe in a vendor name can't break the statement and every
+        call site shares one template shape QBO can plan-cache.
+        """
+        if params:
+            for key, value in params.items():
+                query = query.replace(f":{key}", f"'{QBOClient._escape(value)}'")
         return await self._make_request(
             "GET",
             company_id,
@@ -104,9 +352,136 @@ class QBOClient:
     
     async def get_report(self, company_id: str, report_name: str, params: Dict) -> Dict[str, Any]:
         """Get a QuickBooks report."""
-        return await self._make_request(
+        response = await self._make_request(
             "GET",
             company_id,
             f"reports/{report_name}",
             params=params
         )
+        self._normalize_report_rows(response)
+        return response
+
+    async def stream_report(
+        self,
+        company_id: str,
+        report_name: str,
+        params: Dict
+    ):
+        """
+        Yield a report's top-level rows as they decode off the wire.
+
+        With ijson installed, each Rows.Row item is parsed incrementally
+        from the streamed response, so a large GL report never holds the
+        raw JSON and the parsed tree in memory at the same time. Without
+        ijson this degrades to get_report and yields the rows of the
+        buffered response.
+        """
+        if ijson is None:
+            response = await self.get_report(company_id, report_name, params)
+            for row in response.get('Rows', {}).get('Row', []):
+                yield row
+            return
+
+        access_token = await self.auth_manager.get_valid_access_token()
+        company_base = self._company_urls.setdefault(
+            company_id, f"{self.base_url}/{company_id}"
+        )
+        url = f"{company_base}/reports/{report_name}"
+        headers = {**self._base_headers, "Authorization": f"Bearer {access_token}"}
+
+        await _rate_limiter.acquire(company_id)
+        start = time.monotonic()
+        throttled = False
+        try:
+            async with self._client.stream(
+                "GET", url, headers=headers, params=params
+            ) as response:
+                throttled = response.status_code in (429, 502, 503)
+                response.raise_for_status()
+                reader = _AsyncByteReader(response.aiter_bytes())
+                async for row in ijson.items(reader, 'Rows.Row.item'):
+                    # Same "Row is always a list" invariant get_report
+                    # guarantees: wrap any scalar nested Rows.Row before
+                    # the row reaches a consumer
+                    self._normalize_report_rows(row)
+                    yield row
+        finally:
+            await _rate_limiter.release(time.monotonic() - start, throttled)
+
+    async def batch(self, company_id: str, operations: List[Dict]) -> Dict[str, Any]:
+        """
+        Execute a list of BatchItemRequest operations in one HTTP request.
+
+        Each operation is a prebuilt BatchItemRequest entry, e.g.
+        {'bId': '1', 'operation': 'create', 'Purchase': {...}}. Callers are
+        responsible for staying within QBO's 30-operation batch limit.
+        """
+        return await self._make_request(
+            "POST",
+            company_id,
+            "batch",
+            data={'BatchItemRequest': operations}
+        )
+
+    async def get_reports_batch(
+        self,
+        company_id: str,
+        report_requests: List[Tuple[str, Dict]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch several reports in one consolidated batch request.
+
+        QBO's /batch endpoint accepts multiple BatchItemRequest entries,
+        so N report fetches collapse into a single HTTP round trip
+        instead of N.
+
+        Args:
+            company_id: QuickBooks company ID
+            report_requests: (report_name, params) pairs, in desired order
+
+        Returns:
+            One report dict per request, in request order
+        """
+        batch_payload = {
+            'BatchItemRequest': [
+                {
+                    'bId': str(index),
+                    'ReportQuery': {'Report': report_name, **params}
+                }
+                for index, (report_name, params) in enumerate(report_requests)
+            ]
+        }
+        response = await self._make_request(
+            "POST", company_id, "batch", data=batch_payload
+        )
+
+        # QBO does not guarantee response order; re-sequence by bId
+        by_bid = {
+            item.get('bId'): item
+            for item in response.get('BatchItemResponse', [])
+        }
+        reports = []
+        for index in range(len(report_requests)):
+            report = by_bid.get(str(index), {}).get('Report', {})
+            self._normalize_report_rows(report)
+            reports.append(report)
+        return reports
+
+    @staticmethod
+    def _normalize_report_rows(node: Dict[str, Any]):
+        """
+        Wrap scalar Rows.Row values in lists, in place.
+
+        QBO returns Row as either an object or a list. Normalizing once
+        here lets every downstream parser iterate without re-checking the
+        type at each nesting level.
+        """
+        stack = [node]
+        while stack:
+            rows = stack.pop().get('Rows')
+            if rows and 'Row' in rows:
+                row = rows['Row']
+                if not isinstance(row, list):
+                    row = [row]
+                    rows['Row'] = row
+                stack.extend(row)
@@ -666,14 +666,13 @@ async def handle_pdf_parse(arguments: dict) -> Sequence[TextContent]:
     
     # Parse PDF
     transactions = await pdf_parser.parse_pdf(pdf_path, doc_type)
-    
-    # Match accounts using AI
-    for txn in transactions:
-        match = await ai_matcher.match_account(
-            txn["description"],
-            txn.get("amount"),
-            company_id
-        )
+
+    # Match accounts using AI (one batch call instead of per-transaction)
+    matches = await ai_matcher.match_accounts_batch(
+        [txn["description"] for txn in transactions],
+        company_id
+    )
+    for txn, match in zip(transactions, matches):
         txn["suggested_account"] = match["account_name"]
         txn["confidence"] = match["confidence"]
     
@@ -698,7 +697,18 @@ async def handle_csv_import(arguments: dict) -> Sequence[TextContent]:
     
     # Parse CSV
     transactions = await csv_parser.parse_csv(csv_path, txn_type, column_mapping)
-    
+
+    # Suggest accounts for rows that came in without one (single batch call)
+    unmatched = [txn for txn in transactions if not txn.get("account_name")]
+    if unmatched:
+        matches = await ai_matcher.match_accounts_batch(
+            [txn["description"] for txn in unmatched],
+            company_id
+        )
+        for txn, match in zip(unmatched, matches):
+            txn["suggested_account"] = match["account_name"]
+            txn["confidence"] = match["confidence"]
+
     # Validate transactions
     validation_results = await validator.validate_transactions(transactions, company_id)
     
@@ -792,7 +802,7 @@ async def handle_get_chart_of_accounts(arguments: dict) -> Sequence[TextContent]
     
     accounts = await account_manager.get_chart_of_accounts(company_id, account_type)
     
-    return [TextContent(type="text", text=str(accounts))]
+    return [TextContent(type="text", text=str([acc.to_dict() for acc in accounts]))]
 
 
 async def handle_get_bank_transactions(arguments: dict) -> Sequence[TextContent]:
@@ -945,7 +955,7 @@ async def main():
     auth_manager = QBOAuthManager()
     qbo_client = QBOClient(auth_manager)
     transaction_manager = TransactionManager(qbo_client)
-    account_manager = AccountManager(qbo_client)
+    account_manager = AccountManager.get(qbo_client)
     report_manager = ReportManager(qbo_client)
     pdf_parser = PDFParser()
     csv_parser = CSVParser()
@@ -954,13 +964,18 @@ async def main():
     
     logger.info("QuickBooks MCP Server initialized successfully")
     
-    # Run the server
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    # Run the server; the pooled HTTP client is closed on the way out so
+    # keep-alive connections don't linger past shutdown
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+    finally:
+        await transaction_manager.batcher.aclose()
+        await qbo_client.aclose()
 
 
 if __name__ == "__main__":
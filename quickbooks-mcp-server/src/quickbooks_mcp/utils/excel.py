@@ -3,30 +3,89 @@ Excel report generation for UltraTax integration.
 Creates formatted Excel workbooks with tax mapping data.
 """
 import logging
+import zipfile
 from typing import Dict, Any, List
 from datetime import datetime
+from xml.sax.saxutils import escape
 import openpyxl
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 
 logger = logging.getLogger(__name__)
 
+# Static XLSX package parts for the direct-XML audit-trail fast path.
+# openpyxl's per-cell object model dominates CPU for 10k+ row exports;
+# emitting sheet XML into a zip directly sidesteps it entirely.
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Audit Trail" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+# Style 1 = bold header, style 2 = $#,##0.00 amounts
+_XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="&quot;$&quot;#,##0.00"/></numFmts>'
+    '<fonts count="2"><font/><font><b/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border/></borders>'
+    '<cellStyleXfs count="1"><xf/></cellStyleXfs>'
+    '<cellXfs count="3"><xf/><xf fontId="1" applyFont="1"/>'
+    '<xf numFmtId="164" applyNumberFormat="1"/></cellXfs>'
+    '</styleSheet>'
+)
+
 
 class ExcelGenerator:
-    """Generate Excel reports for tax preparation."""
-    
-    def __init__(self):
-        """Initialize Excel generator."""
-        self.header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        self.header_font = Font(bold=True, color="FFFFFF", size=12)
-        self.title_font = Font(bold=True, size=14)
-        self.border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
+    """
+    Generate Excel reports for tax preparation.
+
+    Instances hold no per-workbook state: the style objects below are
+    immutable descriptors that openpyxl copies into each workbook on
+    assignment, so one generator can safely serve concurrent report
+    generation across threads.
+    """
+
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    title_font = Font(bold=True, size=14)
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
     async def generate_tax_report(
         self,
         reports_data: Dict[str, Any],
@@ -56,12 +115,12 @@ class ExcelGenerator:
             # Add cover sheet
             self._create_cover_sheet(wb, start_date, end_date)
             
-            # Add P&L sheet if available
-            if 'profit_loss' in reports_data:
+            # Add P&L sheet if available (empty reports skip the sheet work)
+            if 'profit_loss' in reports_data and not reports_data['profit_loss'].get('empty'):
                 self._create_pl_sheet(wb, reports_data['profit_loss'])
-            
+
             # Add Balance Sheet if available
-            if 'balance_sheet' in reports_data:
+            if 'balance_sheet' in reports_data and not reports_data['balance_sheet'].get('empty'):
                 self._create_bs_sheet(wb, reports_data['balance_sheet'])
             
             # Add tax mapping sheet
@@ -106,6 +165,21 @@ class ExcelGenerator:
         ws.column_dimensions['A'].width = 20
         ws.column_dimensions['B'].width = 40
     
+    def _write_flat_rows(self, ws, data: Dict[str, Any]) -> int:
+        """Write a flat single-section report; returns the next free row."""
+        row = 2
+        ws[f'A{row}'] = data.get('section', '')
+        ws[f'A{row}'].font = Font(bold=True)
+        row += 1
+
+        for account, amount in zip(data['accounts'], data['amounts']):
+            ws[f'A{row}'] = f"  {account}"
+            ws[f'B{row}'] = amount
+            ws[f'B{row}'].number_format = '$#,##0.00'
+            row += 1
+
+        return row
+
     def _create_pl_sheet(self, wb: openpyxl.Workbook, pl_data: Dict[str, Any]):
         """Create Profit & Loss sheet."""
         ws = wb.create_sheet("Profit & Loss")
@@ -123,26 +197,30 @@ class ExcelGenerator:
             cell.alignment = Alignment(horizontal='center')
         
         # Add data
-        row = 2
-        for data_row in pl_data.get('rows', []):
-            if data_row['type'] == 'section':
-                # Section header
-                ws[f'A{row}'] = data_row['name']
-                ws[f'A{row}'].font = Font(bold=True)
-                row += 1
-                
-                # Section rows
-                for sub_row in data_row.get('rows', []):
-                    if sub_row and sub_row['type'] == 'data':
-                        ws[f'A{row}'] = f"  {sub_row['account']}"
-                        ws[f'B{row}'] = sub_row['amount']
-                        ws[f'B{row}'].number_format = '$#,##0.00'
-                        row += 1
-            elif data_row['type'] == 'data':
-                ws[f'A{row}'] = data_row['account']
-                ws[f'B{row}'] = data_row['amount']
-                ws[f'B{row}'].number_format = '$#,##0.00'
-                row += 1
+        if pl_data.get('flat'):
+            # Single-section fast path: parallel columns, no nesting
+            row = self._write_flat_rows(ws, pl_data)
+        else:
+            row = 2
+            for data_row in pl_data.get('rows', []):
+                if data_row['type'] == 'section':
+                    # Section header
+                    ws[f'A{row}'] = data_row['name']
+                    ws[f'A{row}'].font = Font(bold=True)
+                    row += 1
+
+                    # Section rows
+                    for sub_row in data_row.get('rows', []):
+                        if sub_row and sub_row['type'] == 'data':
+                            ws[f'A{row}'] = f"  {sub_row['account']}"
+                            ws[f'B{row}'] = sub_row['amount']
+                            ws[f'B{row}'].number_format = '$#,##0.00'
+                            row += 1
+                elif data_row['type'] == 'data':
+                    ws[f'A{row}'] = data_row['account']
+                    ws[f'B{row}'] = data_row['amount']
+                    ws[f'B{row}'].number_format = '$#,##0.00'
+                    row += 1
         
         # Adjust column widths
         ws.column_dimensions['A'].width = 40
@@ -171,24 +249,28 @@ class ExcelGenerator:
             cell.alignment = Alignment(horizontal='center')
         
         # Add data (similar to P&L)
-        row = 2
-        for data_row in bs_data.get('rows', []):
-            if data_row['type'] == 'section':
-                ws[f'A{row}'] = data_row['name']
-                ws[f'A{row}'].font = Font(bold=True)
-                row += 1
-                
-                for sub_row in data_row.get('rows', []):
-                    if sub_row and sub_row['type'] == 'data':
-                        ws[f'A{row}'] = f"  {sub_row['account']}"
-                        ws[f'B{row}'] = sub_row['amount']
-                        ws[f'B{row}'].number_format = '$#,##0.00'
-                        row += 1
-            elif data_row['type'] == 'data':
-                ws[f'A{row}'] = data_row['account']
-                ws[f'B{row}'] = data_row['amount']
-                ws[f'B{row}'].number_format = '$#,##0.00'
-                row += 1
+        if bs_data.get('flat'):
+            # Single-section fast path: parallel columns, no nesting
+            row = self._write_flat_rows(ws, bs_data)
+        else:
+            row = 2
+            for data_row in bs_data.get('rows', []):
+                if data_row['type'] == 'section':
+                    ws[f'A{row}'] = data_row['name']
+                    ws[f'A{row}'].font = Font(bold=True)
+                    row += 1
+
+                    for sub_row in data_row.get('rows', []):
+                        if sub_row and sub_row['type'] == 'data':
+                            ws[f'A{row}'] = f"  {sub_row['account']}"
+                            ws[f'B{row}'] = sub_row['amount']
+                            ws[f'B{row}'].number_format = '$#,##0.00'
+                            row += 1
+                elif data_row['type'] == 'data':
+                    ws[f'A{row}'] = data_row['account']
+                    ws[f'B{row}'] = data_row['amount']
+                    ws[f'B{row}'].number_format = '$#,##0.00'
+                    row += 1
         
         # Adjust column widths
         ws.column_dimensions['A'].width = 40
@@ -326,3 +408,120 @@ class ExcelGenerator:
         except Exception as e:
             logger.error(f"Error generating audit trail: {str(e)}")
             raise
+
+    def generate_report_from_arrow(
+        self,
+        table,
+        output_path: str,
+        sheet_name: str = "Report"
+    ) -> str:
+        """
+        Write a flat columnar report (Arrow table) to XLSX.
+
+        Uses openpyxl's write-only workbook, which streams rows to disk in
+        constant memory; columns are materialized in 4096-row chunks so
+        neither the table nor the workbook is ever fully resident.
+
+        Args:
+            table: Arrow table with section | account | amount columns
+            output_path: Path to save Excel file
+            sheet_name: Worksheet title
+
+        Returns:
+            Path to generated Excel file
+        """
+        logger.info(f"Generating columnar report Excel: {output_path}")
+
+        try:
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet(sheet_name)
+
+            ws.append([name.replace('_', ' ').title() for name in table.column_names])
+
+            for batch in table.to_batches(max_chunksize=4096):
+                for row in zip(*(col.to_pylist() for col in batch.columns)):
+                    ws.append(list(row))
+
+            wb.save(output_path)
+            logger.info(f"Columnar report saved: {output_path}")
+            return output_path
+
+        except Exception as e:
+            logger.error(f"Error generating columnar report: {str(e)}")
+            raise
+
+    def generate_audit_trail_fast(
+        self,
+        transactions: List[Dict[str, Any]],
+        output_path: str
+    ) -> str:
+        """
+        Generate an audit trail XLSX by writing sheet XML directly.
+
+        Skips openpyxl's cell object model, which is the bottleneck for
+        large exports: text goes out as inline strings and amounts as
+        numeric cells with a currency format, streamed straight into the
+        zip archive. Output columns match generate_audit_trail.
+
+        Args:
+            transactions: List of transactions
+            output_path: Path to save Excel file
+
+        Returns:
+            Path to generated Excel file
+        """
+        logger.info(f"Generating audit trail Excel (fast path): {output_path}")
+
+        try:
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+                zf.writestr('_rels/.rels', _XLSX_ROOT_RELS)
+                zf.writestr('xl/workbook.xml', _XLSX_WORKBOOK)
+                zf.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+                zf.writestr('xl/styles.xml', _XLSX_STYLES)
+
+                with zf.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+                    write = sheet.write
+                    write(
+                        b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                        b'<sheetData>'
+                    )
+
+                    headers = ['Date', 'Type', 'Vendor/Customer', 'Account',
+                               'Amount', 'Description', 'Source']
+                    header_cells = ''.join(
+                        f'<c t="inlineStr" s="1"><is><t>{h}</t></is></c>' for h in headers
+                    )
+                    write(f'<row r="1">{header_cells}</row>'.encode())
+
+                    for row_num, txn in enumerate(transactions, 2):
+                        texts = (
+                            txn.get('date', ''),
+                            txn.get('type', ''),
+                            txn.get('vendor_name', '') or txn.get('customer_name', ''),
+                            txn.get('account_name', ''),
+                        )
+                        trailing = (
+                            txn.get('description', ''),
+                            txn.get('source_file', ''),
+                        )
+                        cells = ''.join(
+                            f'<c t="inlineStr"><is><t>{escape(str(v))}</t></is></c>'
+                            for v in texts
+                        )
+                        cells += f'<c s="2"><v>{txn.get("amount", 0) or 0}</v></c>'
+                        cells += ''.join(
+                            f'<c t="inlineStr"><is><t>{escape(str(v))}</t></is></c>'
+                            for v in trailing
+                        )
+                        write(f'<row r="{row_num}">{cells}</row>'.encode())
+
+                    write(b'</sheetData></worksheet>')
+
+            logger.info(f"Audit trail saved: {output_path}")
+            return output_path
+
+        except Exception as e:
+            logger.error(f"Error generating audit trail (fast path): {str(e)}")
+            raise
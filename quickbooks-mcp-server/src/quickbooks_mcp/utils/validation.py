@@ -50,7 +50,7 @@ class DataValidator:
         
         # Get chart of accounts for validation
         accounts = await self.account_manager.get_chart_of_accounts(company_id, 'all')
-        account_names = [acc['name'].lower() for acc in accounts]
+        account_names = [acc.name.lower() for acc in accounts]
         
         for idx, txn in enumerate(transactions):
             validation = self._validate_single_transaction(txn, account_names)